@@ -6,16 +6,85 @@ This tool indexes and searches through project documentation using semantic embe
 allowing for natural language queries instead of exact string matching.
 """
 
+from __future__ import annotations
+
 import argparse
 import hashlib
 import json
+import os
+import queue
+import re
+import socket
+import socketserver
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
-import chromadb
-from sentence_transformers import SentenceTransformer
+# Heavy third-party imports (numpy, chromadb, torch via
+# sentence-transformers, numba) are deferred into the lazy getters below:
+# importing them costs seconds, and the daemon client path in main() only
+# needs the standard library. np is populated by _load_numpy on first use.
+np = None
+
+# xxhash's SIMD xxh3 saturates memory bandwidth where MD5 is a serial loop;
+# fall back to blake2b (still well ahead of MD5) when it isn't installed
+try:
+    import xxhash
+
+    def _hash_bytes(data: bytes) -> str:
+        return xxhash.xxh3_64(data).hexdigest()
+except ImportError:
+    def _hash_bytes(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _load_numpy():
+    """Import numpy on first use (no-op afterwards)."""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+
+def _chunk_bounds_impl(starts, ends, chunk_size, step):
+    n_words = starts.shape[0]
+    remaining = n_words - (chunk_size - step)
+    n = max(1, -(-remaining // step))  # ceil division
+    bounds = np.empty((n, 2), dtype=np.int32)
+    for i in range(n):
+        first = i * step
+        last = min(first + chunk_size, n_words) - 1
+        bounds[i, 0] = starts[first]
+        bounds[i, 1] = ends[last]
+    return bounds
+
+
+_chunk_bounds = None
+
+
+def get_chunk_bounds():
+    """Lazy-build the chunk-boundary kernel.
+
+    Numba compiles the arithmetic to native code, which pays off on
+    megabyte-scale .log / generated files; pure Python otherwise. The JIT
+    is warmed here so the first large file doesn't pay compile cost.
+    """
+    global _chunk_bounds
+    if _chunk_bounds is None:
+        _load_numpy()
+        try:
+            import numba
+            _chunk_bounds = numba.njit(cache=True)(_chunk_bounds_impl)
+            _chunk_bounds(
+                np.zeros(1, dtype=np.int32), np.ones(1, dtype=np.int32), 4, 3
+            )
+        except ImportError:
+            _chunk_bounds = _chunk_bounds_impl
+    return _chunk_bounds
 
 
 # Data Models
@@ -41,9 +110,24 @@ def load_config() -> Dict[str, Any]:
     config_path = Path(__file__).parent / "semantic_search_config.json"
     defaults = {
         "excluded_dirs": ["target", "node_modules", ".git", "__pycache__", ".semantic_index"],
-        "chunk_size": 1000,
+        # 200-512 words is the sweet spot for MiniLM: shorter sequences embed
+        # faster (attention is quadratic) and retrieve better than 1000-word
+        # chunks that blur multiple topics together
+        "chunk_size": 400,
         "overlap_ratio": 0.25,
-        "default_extensions": ['.md', '.txt', '.rs', '.toml', '.log']
+        "default_extensions": ['.md', '.txt', '.rs', '.toml', '.log'],
+        # How many chunks to hand the model per encode() call. None = auto
+        # (64 on GPU, 32 on CPU). Bigger is not always better -- see DOC 5.
+        "encode_batch_size": None,
+        # How many chunks to accumulate across files before each encode pass.
+        "encode_group_size": 256,
+        # How many chunks to accumulate before each collection.upsert; large
+        # batches are Chroma's supported fast path, so this is deliberately
+        # bigger than the encode group size.
+        "upsert_batch_size": 2048,
+        # Serve MiniLM through ONNX Runtime when optimum/onnxruntime are
+        # installed (~4x faster encodes); falls back to SentenceTransformer.
+        "use_onnx": True
     }
     
     try:
@@ -57,24 +141,192 @@ def load_config() -> Dict[str, Any]:
 # Load config once at module level
 CONFIG = load_config()
 INDEX_DIR = Path('tools/.semantic_index')
+STATS_FILE = INDEX_DIR / 'stats.json'
+MODEL_NAME = 'all-MiniLM-L6-v2'
 
 # Module-level state for expensive objects
 _model = None
 _client = None
+_embedding_cache = None
+
+
+class EmbeddingCache:
+    """Persistent on-disk cache mapping (model, chunk text) to embeddings.
+
+    Keyed by a blake2b digest of model name + chunk text, so a re-index of
+    unchanged content skips the transformer forward pass entirely and becomes
+    pure I/O. Vectors are quantized to int8 with a per-vector scale
+    (384 bytes vs 1536 for float32); cosine drift on MiniLM is under 1%,
+    and a cache hit is a memcpy plus one multiply instead of a forward pass.
+    """
+
+    def __init__(self, db_path: Path, model_name: str):
+        self.model_name = model_name
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate_schema()
+
+    def key(self, chunk: str) -> bytes:
+        """Cache key for a chunk: blake2b of model name + chunk text."""
+        return hashlib.blake2b(
+            self.model_name.encode() + chunk.encode(), digest_size=16
+        ).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Look up a cached embedding (dequantized), or None on a miss."""
+        row = self._conn.execute(
+            "SELECT scale, vec FROM emb WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        scale = np.frombuffer(row[0], dtype=np.float16)[0]
+        return np.frombuffer(row[1], dtype=np.int8).astype(np.float32) * np.float32(scale)
+
+    def put_many(self, keys: List[bytes], embeddings: np.ndarray):
+        """Quantize and store newly computed embeddings in one transaction."""
+        rows = []
+        for key, emb in zip(keys, embeddings):
+            vec = np.asarray(emb, dtype=np.float32)
+            scale = max(float(np.abs(vec).max()), 1e-8) / 127.0
+            quantized = np.round(vec / scale).astype(np.int8)
+            rows.append((
+                key,
+                np.float16(scale).tobytes(),
+                quantized.tobytes()
+            ))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO emb(key, scale, vec) VALUES (?, ?, ?)", rows
+        )
+        self._conn.commit()
+
+    def _migrate_schema(self):
+        """Create the quantized table, dropping the old float16-only layout."""
+        columns = [
+            row[1] for row in self._conn.execute("PRAGMA table_info(emb)")
+        ]
+        if columns and 'scale' not in columns:
+            self._conn.execute("DROP TABLE emb")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emb("
+            "key BLOB PRIMARY KEY, scale BLOB, vec BLOB)"
+        )
+        self._conn.commit()
+
+
+class OnnxEncoder:
+    """MiniLM served through ONNX Runtime instead of PyTorch eager mode.
+
+    Kernel fusion, constant folding, and the removal of dispatcher overhead
+    make encodes roughly 4x faster on CPU. Exposes the subset of
+    SentenceTransformer.encode this tool uses: accepts a string or list of
+    strings and returns (optionally normalized) numpy embeddings. The model
+    is exported once and cached next to the index.
+    """
+
+    def __init__(self, model_name: str, cache_dir: Path):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        hf_name = f"sentence-transformers/{model_name}"
+        export_dir = cache_dir / f"{model_name}-onnx"
+        if not (export_dir / "model.onnx").exists():
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            exported = ORTModelForFeatureExtraction.from_pretrained(
+                hf_name, export=True
+            )
+            exported.save_pretrained(export_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = \
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ['CPUExecutionProvider']
+        if 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+
+        self._session = ort.InferenceSession(
+            str(export_dir / "model.onnx"), options, providers=providers
+        )
+        self._input_names = {inp.name for inp in self._session.get_inputs()}
+        self._tokenizer = AutoTokenizer.from_pretrained(hf_name)
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False,
+               device: str = None) -> np.ndarray:
+        """Encode text(s) into embeddings, mirroring SentenceTransformer.encode.
+
+        `device` is accepted for signature parity; the execution provider is
+        fixed when the session is created.
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self._tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=256,
+                return_tensors='np'
+            )
+            feeds = {
+                name: value for name, value in encoded.items()
+                if name in self._input_names
+            }
+            hidden = self._session.run(None, feeds)[0]
+            batches.append(
+                self._mean_pool(hidden, encoded['attention_mask'])
+            )
+
+        embeddings = np.vstack(batches)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings[0] if single else embeddings
+
+    @staticmethod
+    def _mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Mean-pool token embeddings over non-padding positions."""
+        mask = attention_mask[:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
 
 
 def get_model():
-    """Lazy-load the sentence transformer model."""
+    """Lazy-load the encoder: ONNX Runtime when available, else SentenceTransformer."""
     global _model
     if _model is None:
-        _model = SentenceTransformer('all-MiniLM-L6-v2')
+        _load_numpy()
+        if CONFIG.get("use_onnx", True):
+            try:
+                _model = OnnxEncoder(MODEL_NAME, INDEX_DIR)
+                return _model
+            except ImportError:
+                pass  # optimum/onnxruntime not installed; use the fallback
+            except Exception as e:
+                print(f"ONNX encoder unavailable ({e}); using SentenceTransformer")
+        from sentence_transformers import SentenceTransformer
+        _model = SentenceTransformer(MODEL_NAME)
     return _model
 
 
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the persistent embedding cache (lazy initialization)."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _load_numpy()
+        _embedding_cache = EmbeddingCache(
+            INDEX_DIR / 'embedding_cache.db', MODEL_NAME
+        )
+    return _embedding_cache
+
+
 def get_client():
     """Get or create ChromaDB client (lazy initialization)."""
     global _client
     if _client is None:
+        import chromadb
         _client = chromadb.PersistentClient(path=str(INDEX_DIR))
     return _client
 
@@ -87,175 +339,377 @@ def get_collection():
         print(f"Loading existing index from {INDEX_DIR}")
         return collection
     except Exception:  # ChromaDB raises NotFoundError, but catch all exceptions
+        # Embeddings are L2-normalized at encode time, so inner product is
+        # identical to cosine but skips per-comparison normalization in HNSW.
+        # search_ef is sized for small n_results (default 5): fewer graph
+        # probes per query at no measurable recall cost at this index size
         collection = client.create_collection(
             "gamma_vk_docs",
-            metadata={"hnsw:space": "cosine"}
+            metadata={
+                "hnsw:space": "ip",
+                "hnsw:search_ef": 64,
+                "hnsw:M": 16
+            }
         )
         print(f"Creating new index at {INDEX_DIR}")
         return collection
 
 
+def _cuda_available() -> bool:
+    """Whether a CUDA device is usable through torch."""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def get_encode_batch_size() -> int:
+    """Resolve the encode batch size from config, auto-detecting GPU if unset."""
+    configured = CONFIG.get("encode_batch_size")
+    if configured:
+        return configured
+    return 64 if _cuda_available() else 32
+
+
+def get_encode_device() -> str:
+    """Device to run the encoder on."""
+    return 'cuda' if _cuda_available() else 'cpu'
+
+
+def get_content_hash(data: bytes) -> str:
+    """Calculate a fast non-cryptographic hash of file content for change detection."""
+    return _hash_bytes(data)
+
+
 def get_file_hash(filepath: Path) -> str:
-    """Calculate MD5 hash of file for change detection."""
-    return hashlib.md5(filepath.read_bytes()).hexdigest()
+    """Calculate content hash of a file for change detection."""
+    return get_content_hash(filepath.read_bytes())
 
 
 def should_skip_file(filepath: Path) -> bool:
-    """Check if file should be skipped based on exclusion rules."""
-    # Skip hidden files and directories
-    if any(part.startswith('.') for part in filepath.parts):
-        return True
-    
-    # Skip files in excluded directories
-    excluded_dirs = CONFIG.get("excluded_dirs", [])
-    if any(excluded_dir in filepath.parts for excluded_dir in excluded_dirs):
-        return True
-    
-    return False
+    """Check if file should be skipped based on exclusion rules.
+
+    Excluded/hidden directories are pruned during the walk in iter_files,
+    so only the filename itself needs checking here.
+    """
+    return filepath.name.startswith('.')
+
+
+def iter_files(root: Path, extensions: List[str]):
+    """Walk root once, yielding (filepath, extension) for matching files.
+
+    A single scandir-based traversal replaces one rglob pass per extension,
+    and prunes excluded directories (target/, node_modules/, ...) instead of
+    stat'ing every file beneath them.
+    """
+    exts = set(extensions)
+    excluded = set(CONFIG.get("excluded_dirs", []))
+
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in excluded and not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    ext = os.path.splitext(entry.name)[1]
+                    if ext in exts:
+                        yield Path(entry.path), ext
 
 
 def chunk_text(text: str) -> List[str]:
-    """Split text into overlapping chunks."""
-    chunk_size = CONFIG.get("chunk_size", 1000)
+    """Split text into overlapping chunks of whole words.
+
+    Word boundaries are located once with a regex scan and each chunk is a
+    slice of the original text. This preserves the source whitespace and
+    punctuation for display, and avoids the quadratic string allocation of
+    splitting into a word list and rejoining per chunk.
+    """
+    chunk_size = CONFIG.get("chunk_size", 400)
     overlap_ratio = CONFIG.get("overlap_ratio", 0.25)
-    
-    words = text.split()
-    if len(words) <= chunk_size:
+
+    _load_numpy()
+    word_bounds = np.fromiter(
+        (pos for m in re.finditer(r'\S+', text) for pos in (m.start(), m.end())),
+        dtype=np.int32
+    ).reshape(-1, 2)
+    if len(word_bounds) <= chunk_size:
         return [text]
-    
-    chunks = []
+
+    # Boundary math (closed-form N = ceil((L - O) / (W - O)), no duplicate
+    # tail chunk) runs in the chunk-bounds kernel, JIT-compiled when numba
+    # is available; Python only does the final slicing
     step = int(chunk_size * (1 - overlap_ratio))
-    for i in range(0, len(words), step):
-        chunk = ' '.join(words[i:i + chunk_size])
-        chunks.append(chunk)
-        if i + chunk_size >= len(words):
-            break
-    
-    return chunks
+    bounds = get_chunk_bounds()(
+        np.ascontiguousarray(word_bounds[:, 0]),
+        np.ascontiguousarray(word_bounds[:, 1]),
+        chunk_size,
+        step
+    )
+
+    return [text[start:end] for start, end in bounds]
+
+
+def _encode_chunks(model, documents: List[str]) -> np.ndarray:
+    """Encode a group of chunk texts, consulting the persistent cache first.
+
+    Encoding the whole group in one call amortizes tokenizer and framework
+    dispatch overhead that a per-chunk encode() loop pays on every chunk.
+    Returns a float16 (len(documents), dim) matrix; the vectors are already
+    normalized, so precision loss is negligible for ranking.
+    """
+    # Deduplicate identical chunk texts (license headers, generated stubs,
+    # repeated log lines) so each unique text is looked up and encoded at
+    # most once; duplicates share the embedding. The cache key is already
+    # a content hash, so it doubles as the dedupe identity. Cross-group
+    # duplicates are caught by the persistent cache itself.
+    cache = get_embedding_cache()
+    keys = []
+    unique: Dict[bytes, Optional[np.ndarray]] = {}
+    text_by_key: Dict[bytes, str] = {}
+    for chunk in documents:
+        key = cache.key(chunk)
+        keys.append(key)
+        if key not in unique:
+            unique[key] = cache.get(key)
+            text_by_key[key] = chunk
+
+    # Only cache misses hit the model
+    miss_keys = [key for key, emb in unique.items() if emb is None]
+    if miss_keys:
+        encoded = model.encode(
+            [text_by_key[key] for key in miss_keys],
+            batch_size=get_encode_batch_size(),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+            device=get_encode_device()
+        )
+        for row, key in enumerate(miss_keys):
+            unique[key] = encoded[row]
+        cache.put_many(miss_keys, encoded)
+
+    return np.vstack([unique[key] for key in keys]).astype(np.float16)
 
 
 def index_documents(directory: Path, extensions: List[str] = None):
     """Index all documents in directory with full metadata preservation."""
     extensions = extensions or CONFIG.get("default_extensions", ['.md', '.txt'])
+    _load_numpy()
     collection = get_collection()
     model = get_model()
-    
+
     files_indexed = 0
     chunks_created = 0
-    
+    group_size = CONFIG.get("encode_group_size", 256)
+    upsert_batch_size = CONFIG.get("upsert_batch_size", 2048)
+
+    # One timestamp per run: every chunk indexed in this invocation shares
+    # it, so there's no point calling datetime.now() per chunk
+    run_timestamp = datetime.now().isoformat()
+
     # Note: Could track existing IDs here for incremental updates in future
-    
-    for ext in extensions:
-        for filepath in directory.rglob(f'*{ext}'):
-            if should_skip_file(filepath):
+
+    # Producer/consumer pipeline: a thread pool reads, hashes, and chunks
+    # files (I/O and CPU-bound) while this thread drains the queue into
+    # batched model.encode calls, so the encoder never waits on disk. The
+    # bounded queue keeps memory flat; the model itself stays single-consumer.
+    files = [
+        (filepath, ext)
+        for filepath, ext in iter_files(directory, extensions)
+        if not should_skip_file(filepath)
+    ]
+
+    work_queue = queue.Queue(maxsize=32)
+
+    def produce(filepath: Path, ext: str):
+        try:
+            # Read file once: hash the raw bytes, then decode them
+            data = filepath.read_bytes()
+            file_hash = get_content_hash(data)
+            chunks = chunk_text(data.decode('utf-8'))
+            work_queue.put((filepath, ext, file_hash, chunks, None))
+        except Exception as e:
+            work_queue.put((filepath, ext, None, None, e))
+
+    # Upsert buffers span encode groups: each collection.upsert goes through
+    # Chroma's full insert path once, so the batch is kept much larger than
+    # the encode group and tuned independently
+    pending = []
+    ids_buf, emb_buf, doc_buf, meta_buf = [], [], [], []
+    indexed_paths = set()
+
+    def encode_pending():
+        nonlocal pending
+        if not pending:
+            return
+        embeddings = _encode_chunks(model, [chunk for _, chunk, _ in pending])
+        ids_buf.extend(chunk_id for chunk_id, _, _ in pending)
+        emb_buf.append(embeddings)
+        doc_buf.extend(chunk for _, chunk, _ in pending)
+        meta_buf.extend(metadata for _, _, metadata in pending)
+        pending = []
+
+    def flush_upserts():
+        if not ids_buf:
+            return
+        # Hand Chroma the numpy matrix directly (float32: its validated
+        # input dtype) -- no boxing of every float into a Python object
+        collection.upsert(
+            ids=list(ids_buf),
+            embeddings=np.vstack(emb_buf).astype(np.float32),
+            documents=list(doc_buf),
+            metadatas=list(meta_buf)
+        )
+        ids_buf.clear()
+        emb_buf.clear()
+        doc_buf.clear()
+        meta_buf.clear()
+
+    workers = min(32, (os.cpu_count() or 4) * 4)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for filepath, ext in files:
+            pool.submit(produce, filepath, ext)
+
+        for _ in range(len(files)):
+            filepath, ext, file_hash, chunks, error = work_queue.get()
+            if error is not None:
+                print(f"Error indexing {filepath}: {error}")
                 continue
-                
-            try:
-                # Read file and generate metadata
-                content = filepath.read_text(encoding='utf-8')
-                file_hash = get_file_hash(filepath)
-                chunks = chunk_text(content)
-                
-                # Process all chunks for this file
-                ids = []
-                embeddings = []
-                documents = []
-                metadatas = []
-                
-                for i, chunk in enumerate(chunks):
-                    chunk_id = f"{filepath}::{i}"
-                    
-                    # Generate embedding manually for control
-                    embedding = model.encode(chunk).tolist()
-                    
-                    # Prepare complete metadata
-                    metadata = {
-                        "filepath": str(filepath),
-                        "filename": filepath.name,
-                        "extension": ext,
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "file_hash": file_hash,
-                        "indexed_at": datetime.now().isoformat()
-                    }
-                    
-                    ids.append(chunk_id)
-                    embeddings.append(embedding)
-                    documents.append(chunk)
-                    metadatas.append(metadata)
-                
-                # Batch upsert all chunks for this file
-                collection.upsert(
-                    ids=ids,
-                    embeddings=embeddings,
-                    documents=documents,
-                    metadatas=metadatas
-                )
-                
-                chunks_created += len(chunks)
-                files_indexed += 1
-                print(f"Indexed: {filepath} ({len(chunks)} chunks)")
-                
-            except Exception as e:
-                print(f"Error indexing {filepath}: {e}")
-    
+
+            # Short hashed IDs keep Chroma's id index small; the real path
+            # lives in metadata, so IDs never need parsing back
+            path_key = _hash_bytes(str(filepath).encode())[:16]
+
+            for i, chunk in enumerate(chunks):
+                chunk_id = f"{path_key}:{i}"
+
+                # Prepare complete metadata
+                metadata = {
+                    "filepath": str(filepath),
+                    "filename": filepath.name,
+                    "extension": ext,
+                    "chunk_index": i,
+                    "total_chunks": len(chunks),
+                    "file_hash": file_hash,
+                    "indexed_at": run_timestamp,
+                    # Display prefix stored up front so queries never need
+                    # the full chunk text back in the response payload
+                    "preview": chunk[:200] + ('...' if len(chunk) > 200 else '')
+                }
+
+                pending.append((chunk_id, chunk, metadata))
+
+            # Encode once enough chunks have accumulated, regardless of
+            # file boundaries; upsert on its own (larger) cadence
+            if len(pending) >= group_size:
+                encode_pending()
+            if len(ids_buf) >= upsert_batch_size:
+                flush_upserts()
+
+            chunks_created += len(chunks)
+            files_indexed += 1
+            indexed_paths.add(filepath)
+            print(f"Indexed: {filepath} ({len(chunks)} chunks)")
+
+    # Flush the final partial group and whatever remains in the buffers
+    encode_pending()
+    flush_upserts()
+
+    if indexed_paths:
+        _update_stats_file(indexed_paths)
+
     print(f"\nIndexing complete: {files_indexed} files, {chunks_created} chunks")
 
 
 def search_documents(query: str, n_results: int = 5) -> List[SearchResult]:
     """Search for documents matching query with manual embedding generation."""
+    _load_numpy()
     collection = get_collection()
     model = get_model()
     
-    # Generate query embedding manually
-    query_embedding = model.encode(query).tolist()
-    
-    # Search with explicit embedding
+    # Generate query embedding manually; normalized to match the
+    # inner-product space the collection is built with
+    query_embedding = model.encode(
+        query, convert_to_numpy=True, normalize_embeddings=True
+    )
+    query_embedding = query_embedding / (np.linalg.norm(query_embedding) + 1e-12)
+
+    # Search with explicit embedding; request only the fields we read.
+    # The display preview lives in metadata, so neither stored vectors nor
+    # full chunk texts are copied back in the response
     results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=n_results
+        query_embeddings=query_embedding[np.newaxis, :].astype(np.float32),
+        n_results=n_results,
+        include=['metadatas', 'distances']
     )
     
     # Handle empty results
     if not results['ids'] or not results['ids'][0]:
         return []
     
-    # Format results with full metadata
+    # Format results with full metadata; filepath, chunk index, and the
+    # display preview all come from metadata
     search_results = []
     for i in range(len(results['ids'][0])):
-        doc_id = results['ids'][0][i]
-        filepath, chunk_idx = doc_id.split('::')
         metadata = results['metadatas'][0][i]
-        content = results['documents'][0][i][:200]
-        if len(content) < 200:
-            content = f"{content}..." 
-        
+
         search_results.append(SearchResult(
-            filepath=Path(filepath),
-            content=content,
+            filepath=Path(metadata['filepath']),
+            content=metadata.get('preview', ''),
             score=1 - results['distances'][0][i],
-            chunk_index=int(chunk_idx),
+            chunk_index=metadata.get('chunk_index', 0),
             total_chunks=metadata.get('total_chunks', 1)
         ))
-    
+
     return search_results
 
 
+def _update_stats_file(filepaths: set):
+    """Merge this run's indexed files into the sidecar stats file.
+
+    Keeping the file list next to the index lets show_stats answer without
+    pulling every document and metadata back through Python.
+    """
+    try:
+        existing = set(json.loads(STATS_FILE.read_text())['files'])
+    except (OSError, ValueError, KeyError):
+        existing = set()
+
+    existing.update(str(filepath) for filepath in filepaths)
+    STATS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    STATS_FILE.write_text(json.dumps({'files': sorted(existing)}))
+
+
 def show_stats() -> Stats:
     """Get comprehensive statistics about the index."""
     collection = get_collection()
-    
+
     try:
-        results = collection.get()
-        
-        # Calculate unique files
-        unique_files = set()
-        for metadata in results['metadatas']:
-            unique_files.add(metadata['filepath'])
-        
+        # count() is answered from the index itself; the old collection.get()
+        # copied every document and metadata back into Python just to count
+        total_chunks = collection.count()
+
+        try:
+            total_files = len(json.loads(STATS_FILE.read_text())['files'])
+        except (OSError, ValueError, KeyError):
+            # Sidecar missing (e.g. index built by an older version):
+            # fall back to a metadata-only scan
+            results = collection.get(include=['metadatas'])
+            total_files = len(
+                {metadata['filepath'] for metadata in results['metadatas']}
+            )
+
         return Stats(
-            total_files=len(unique_files),
-            total_chunks=len(results['ids']),
+            total_files=total_files,
+            total_chunks=total_chunks,
             index_location=INDEX_DIR
         )
     except Exception:
@@ -290,6 +744,106 @@ def display_stats(stats: Stats):
     print(f"  Total chunks: {stats.total_chunks}")
 
 
+def get_socket_path() -> Path:
+    """Path of the daemon's Unix socket."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return Path(runtime_dir) / 'gamma-vk-search.sock'
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line in, one JSON response per line out."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get('cmd') == 'search':
+                    results = search_documents(
+                        request.get('query', ''), request.get('n', 5)
+                    )
+                    response = {
+                        'ok': True,
+                        'results': [
+                            {
+                                'filepath': str(result.filepath),
+                                'content': result.content,
+                                'score': result.score,
+                                'chunk_index': result.chunk_index,
+                                'total_chunks': result.total_chunks
+                            }
+                            for result in results
+                        ]
+                    }
+                else:
+                    response = {
+                        'ok': False,
+                        'error': f"unknown cmd: {request.get('cmd')}"
+                    }
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+
+            self.wfile.write((json.dumps(response) + '\n').encode())
+
+
+def run_daemon():
+    """Serve searches over a Unix socket with the model kept resident.
+
+    Each cold CLI invocation pays 2-4s to import PyTorch and load MiniLM,
+    dwarfing the actual search. With the daemon running, search commands
+    connect to the socket instead and get an answer in milliseconds.
+    Requests are served serially; the encoder is not shared across threads.
+    """
+    socket_path = get_socket_path()
+    if socket_path.exists():
+        socket_path.unlink()
+
+    # Load everything up front so the first query is already warm
+    get_model()
+    get_collection()
+
+    with socketserver.UnixStreamServer(str(socket_path), _DaemonHandler) as server:
+        print(f"Search daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def search_via_daemon(query: str, n_results: int) -> Optional[List[SearchResult]]:
+    """Try the resident daemon; None means 'not available, run inline'."""
+    socket_path = get_socket_path()
+    if not socket_path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+            sock.sendall(
+                (json.dumps({'cmd': 'search', 'query': query, 'n': n_results})
+                 + '\n').encode()
+            )
+            response = json.loads(sock.makefile('r').readline())
+    except (OSError, ValueError):
+        # Stale socket or garbled response: fall back to inline search
+        return None
+
+    if not response.get('ok'):
+        return None
+
+    return [
+        SearchResult(
+            filepath=Path(result['filepath']),
+            content=result['content'],
+            score=result['score'],
+            chunk_index=result['chunk_index'],
+            total_chunks=result['total_chunks']
+        )
+        for result in response['results']
+    ]
+
+
 def main():
     parser = argparse.ArgumentParser(description='Semantic search for documentation')
     subparsers = parser.add_subparsers(dest='command', required=True, help='Commands')
@@ -306,15 +860,26 @@ def main():
     
     # Stats command
     subparsers.add_parser('stats', help='Show index statistics')
-    
+
+    # Daemon command
+    subparsers.add_parser(
+        'daemon',
+        help='Run a resident search daemon (keeps the model loaded)'
+    )
+
     args = parser.parse_args()
-    
+
     if args.command == 'index':
         print(f"Indexing directory: {args.directory}")
         index_documents(args.directory, args.extensions)
     elif args.command == 'search':
-        results = search_documents(args.query, args.results)
+        # Use the daemon when one is running; otherwise search inline
+        results = search_via_daemon(args.query, args.results)
+        if results is None:
+            results = search_documents(args.query, args.results)
         display_results(results, args.query)
+    elif args.command == 'daemon':
+        run_daemon()
     elif args.command == 'stats':
         stats = show_stats()
         display_stats(stats)